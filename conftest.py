@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+import os
+
+# Run the suite against an in-memory database (see lib/__init__.py). This
+# has to happen here, before pytest imports the lib package, which opens
+# the connection.
+os.environ.setdefault("COMPANY_DB_IN_MEMORY", "1")
@@ -1,5 +1,27 @@
 # lib/config.py
+import os
 import sqlite3
 
-CONN = sqlite3.connect('company.db')
+# Review keeps its SQL in module constants; a larger statement cache keeps
+# those compiled statements around alongside the other models' queries.
+STATEMENT_CACHE_SIZE = 256
+
+# Test runs set COMPANY_DB_IN_MEMORY to work against a throwaway in-memory db.
+DATABASE = ':memory:' if os.environ.get('COMPANY_DB_IN_MEMORY') else 'company.db'
+
+CONN = sqlite3.connect(DATABASE, cached_statements=STATEMENT_CACHE_SIZE)
+# rows can be read by column name as well as by position
+CONN.row_factory = sqlite3.Row
 CURSOR = CONN.cursor()
+
+# Read the file through a memory map instead of a read() per page. The page
+# size only takes effect when the file is first created, so it comes before
+# switching to WAL.
+CURSOR.execute("PRAGMA mmap_size = 268435456")
+CURSOR.execute("PRAGMA page_size = 8192")
+
+# WAL with synchronous=NORMAL syncs at checkpoints rather than on every
+# commit, which is still safe against corruption after a crash.
+CURSOR.execute("PRAGMA journal_mode = WAL")
+CURSOR.execute("PRAGMA synchronous = NORMAL")
+CURSOR.execute("PRAGMA temp_store = MEMORY")
@@ -9,12 +9,11 @@ import ipdb
 
 
 def reset_database():
-    Review.drop_table()
     Employee.drop_table()
     Department.drop_table()
     Department.create_table()
     Employee.create_table()
-    Review.create_table()
+    Review.reset_table()
 
     # Create seed data
     payroll = Department.create("Payroll", "Building A, 5th Floor")
@@ -186,6 +186,9 @@ class Employee:
         """
         from review import Review  # avoid circular import at module load time
 
-        sql = "SELECT * FROM reviews WHERE employee_id = ?;"
+        sql = """
+            SELECT id, year, summary, employee_id FROM reviews
+            WHERE employee_id = ?;
+        """
         rows = CURSOR.execute(sql, (self.id,)).fetchall()
-        return [Review.instance_from_db(row) for row in rows]
+        return [Review.instance_from_db_with_employee(row, self) for row in rows]
@@ -1,11 +1,84 @@
 # lib/review.py
+import json
+from contextlib import contextmanager
+from operator import index
+
 from __init__ import CONN, CURSOR
+from employee import Employee
+
+# When True, find_by_id() returns instances already cached in Review.all
+# without querying. Disable if rows may be changed outside this process.
+ENABLE_IDENTITY_CACHE = True
+
+# Schema for the reviews table, shared by create_table() and reset_table().
+_SQL_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER PRIMARY KEY,
+        year INTEGER,
+        summary TEXT,
+        employee_id INTEGER,
+        FOREIGN KEY (employee_id) REFERENCES employees(id)
+    );
+"""
+# Employee.reviews() looks reviews up by employee_id
+_SQL_CREATE_INDEX = """
+    CREATE INDEX IF NOT EXISTS ix_reviews_employee_id
+    ON reviews (employee_id);
+"""
+_SQL_DROP_TABLE = "DROP TABLE IF EXISTS reviews;"
+
+# SQL shared by the Review methods. Reusing the same statement text lets
+# sqlite3's per-connection statement cache hand back the compiled statement.
+_SQL_INSERT = """
+    INSERT INTO reviews (year, summary, employee_id)
+    VALUES (?, ?, ?);
+"""
+_SQL_UPDATE = """
+    UPDATE reviews
+    SET year = ?, summary = ?, employee_id = ?
+    WHERE id = ?;
+"""
+_SQL_UPSERT = """
+    INSERT INTO reviews (id, year, summary, employee_id)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        year = excluded.year,
+        summary = excluded.summary,
+        employee_id = excluded.employee_id;
+"""
+_SQL_FIND_BY_ID = """
+    SELECT id, year, summary, employee_id FROM reviews WHERE id = ?;
+"""
+_SQL_GET_ALL = "SELECT id, year, summary, employee_id FROM reviews;"
+_SQL_DELETE = "DELETE FROM reviews WHERE id = ?;"
+# ids are passed as one JSON array, so the number of ids is not bound by
+# SQLite's limit on host parameters (999 before 3.32)
+_SQL_EMPLOYEES_BY_ID = """
+    SELECT * FROM employees
+    WHERE id IN (SELECT value FROM json_each(?));
+"""
+_SQL_REVIEW_EMPLOYEES = """
+    SELECT * FROM employees
+    WHERE id IN (SELECT employee_id FROM reviews);
+"""
 
 
 class Review:
-    # cache of Review instances by id
+    # up to MAX instances are kept in Review.all; slots avoid a per-instance dict
+    __slots__ = ("id", "_year", "_summary", "_employee")
+
+    # cache of Review instances by id, least recently used first
     all = {}
 
+    # most instances kept in Review.all before the least recently used is evicted
+    MAX = 10_000
+
+    # depth of nested Review.transaction() blocks
+    _transaction_depth = 0
+
+    # cursor reserved for find_by_id(), created on first use
+    _find_by_id_cursor = None
+
     def __init__(self, year, summary, employee, id=None):
         """
         `employee` can be:
@@ -32,11 +105,13 @@ class Review:
 
     @year.setter
     def year(self, value):
-        if not isinstance(value, int):
-            raise ValueError("year must be an integer")
-        if value < 2000:
+        try:
+            year = index(value)
+        except TypeError:
+            raise ValueError("year must be an integer") from None
+        if year < 2000:
             raise ValueError("year must be >= 2000")
-        self._year = value
+        self._year = year
 
     @property
     def summary(self):
@@ -44,7 +119,11 @@ class Review:
 
     @summary.setter
     def summary(self, value):
-        if not isinstance(value, str) or len(value.strip()) == 0:
+        try:
+            blank = not str.strip(value)
+        except TypeError:
+            blank = True
+        if blank:
             raise ValueError("summary must be a non-empty string")
         self._summary = value
 
@@ -59,8 +138,6 @@ class Review:
         - an Employee instance, or
         - an integer employee_id
         """
-        from employee import Employee
-
         if isinstance(value, Employee):
             if value.id is None:
                 raise ValueError(
@@ -77,67 +154,213 @@ class Review:
         else:
             raise ValueError("employee must be an Employee instance")
 
+    def _rehydrate(self, year, summary, employee):
+        """Set attributes from a trusted db row, bypassing the validators."""
+        self._year = year
+        self._summary = summary
+        self._employee = employee
+
+    @classmethod
+    def _with_employee(cls, year, summary, employee):
+        """
+        Build a Review for an Employee already loaded from the db.
+        Year and summary are validated; the employee is not looked up again.
+        """
+        review = cls.__new__(cls)
+        review.id = None
+        review.year = year
+        review.summary = summary
+        review._employee = employee
+        return review
+
     @property
     def employee_id(self):
         return self.employee.id if hasattr(self, "_employee") and self._employee else None
 
     @employee_id.setter
     def employee_id(self, value):
-        from employee import Employee
-
         if not isinstance(value, int):
             raise ValueError("employee_id must be an integer")
         employee = Employee.find_by_id(value)
         if not employee:
             raise ValueError("employee_id must refer to a persisted Employee")
-        self.employee = employee
+        self._employee = employee
 
     # -------------------
     # Table management
     # -------------------
     @classmethod
     def create_table(cls):
-        sql = """
-            CREATE TABLE IF NOT EXISTS reviews (
-                id INTEGER PRIMARY KEY,
-                year INTEGER,
-                summary TEXT,
-                employee_id INTEGER,
-                FOREIGN KEY (employee_id) REFERENCES employees(id)
-            );
-        """
-        CURSOR.execute(sql)
-        CONN.commit()
+        CURSOR.execute(_SQL_CREATE_TABLE)
+        CURSOR.execute(_SQL_CREATE_INDEX)
+        cls._commit()
 
     @classmethod
     def drop_table(cls):
-        sql = "DROP TABLE IF EXISTS reviews;"
-        CURSOR.execute(sql)
-        CONN.commit()
+        """Drop the reviews table and empty the cache of its deleted rows."""
+        CURSOR.execute(_SQL_DROP_TABLE)
+        cls._commit()
+        cls.all.clear()
+
+    @classmethod
+    def reset_table(cls):
+        """
+        Drop and recreate the reviews table in a single script and commit,
+        and empty the cache of the now-deleted rows.
+        executescript() commits first, so inside a Review.transaction()
+        block the statements are run one by one instead.
+        """
+        if cls._transaction_depth:
+            CURSOR.execute(_SQL_DROP_TABLE)
+            CURSOR.execute(_SQL_CREATE_TABLE)
+            CURSOR.execute(_SQL_CREATE_INDEX)
+        else:
+            CURSOR.executescript(
+                _SQL_DROP_TABLE + _SQL_CREATE_TABLE + _SQL_CREATE_INDEX)
+            CONN.commit()
+        cls.all.clear()
+
+    # -------------------
+    # Transactions
+    # -------------------
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        """
+        Group writes into one transaction that commits when the block exits.
+
+        save(), update(), delete(), the batch methods and the table methods
+        skip their own commit inside the block. On error the transaction is
+        rolled back and the cache is cleared, since it may hold rows that were
+        never committed. Nested blocks join the outermost transaction.
+
+        Employee and Department writes still commit on their own, which ends
+        the transaction early: writes made before them can no longer be
+        rolled back.
+        """
+        if cls._transaction_depth == 0 and not CONN.in_transaction:
+            CURSOR.execute("BEGIN")
+        cls._transaction_depth += 1
+        try:
+            yield
+        except BaseException:
+            cls._transaction_depth -= 1
+            if cls._transaction_depth == 0:
+                CONN.rollback()
+                cls.all.clear()
+            raise
+        else:
+            cls._transaction_depth -= 1
+            if cls._transaction_depth == 0:
+                CONN.commit()
+
+    @classmethod
+    def _remember(cls, review):
+        """
+        Cache review as the most recently used instance, evicting the least
+        recently used one once Review.all holds more than MAX.
+        Dicts keep insertion order, so re-inserting moves a key to the end.
+        """
+        cache = cls.all
+        cache.pop(review.id, None)
+        cache[review.id] = review
+        if len(cache) > cls.MAX:
+            del cache[next(iter(cache))]
+
+    @classmethod
+    def _commit(cls):
+        """Commit unless a Review.transaction() block is open."""
+        if cls._transaction_depth == 0:
+            CONN.commit()
 
     # -------------------
     # ORM methods
     # -------------------
     def save(self):
         """
-        Persist this Review instance to the database.
-        If it doesn't have an id yet, INSERT and set self.id.
-        If it does, delegate to update().
+        Persist this Review instance to the database with a single UPSERT.
+        A review without an id is inserted and gets the new row's id;
+        one with an id replaces that row, inserting it if missing.
         """
-        if self.id is None:
-            sql = """
-                INSERT INTO reviews (year, summary, employee_id)
-                VALUES (?, ?, ?);
-            """
-            CURSOR.execute(sql, (self.year, self.summary, self.employee.id))
-            CONN.commit()
+        CURSOR.execute(
+            _SQL_UPSERT,
+            (self.id, self.year, self.summary, self.employee.id),
+        )
+        self._commit()
 
+        if self.id is None:
             self.id = CURSOR.lastrowid
-            type(self).all[self.id] = self
-        else:
-            self.update()
+        self._remember(self)
         return self
 
+    @classmethod
+    def bulk_create(cls, triples):
+        """
+        Insert many reviews with a single executemany and one commit.
+
+        `triples` is an iterable of (year, summary, employee_id) tuples.
+        Returns the new Review instances in the same order.
+        """
+        triples = list(triples)
+        employees = cls._employees_by_id({triple[2] for triple in triples})
+        reviews = []
+        for year, summary, employee_id in triples:
+            employee = employees.get(employee_id)
+            if not employee:
+                raise ValueError(
+                    "employee_id must refer to a persisted Employee")
+            reviews.append(cls._with_employee(year, summary, employee))
+        cls._insert_many(reviews)
+        cls._commit()
+        return reviews
+
+    @classmethod
+    def save_many(cls, reviews):
+        """
+        Persist a batch of Review instances in one transaction.
+        Unsaved reviews are inserted, reviews with an id are upserted.
+        An instance listed more than once is saved once.
+        """
+        reviews = list({id(review): review for review in reviews}.values())
+        new = [review for review in reviews if review.id is None]
+        existing = [review for review in reviews if review.id is not None]
+
+        # upsert first, so ids given to new rows land above any
+        # pre-assigned id that is not in the table yet
+        if existing:
+            CURSOR.executemany(
+                _SQL_UPSERT,
+                [(review.id, review.year, review.summary, review.employee.id)
+                 for review in existing],
+            )
+            for review in existing:
+                cls._remember(review)
+        cls._insert_many(new)
+        cls._commit()
+        return reviews
+
+    @classmethod
+    def _insert_many(cls, reviews):
+        """
+        INSERT the given unsaved reviews without committing and assign ids.
+
+        executemany does not report lastrowid, but rows inserted in one
+        statement on this connection get contiguous rowids ending at max(id).
+        """
+        if not reviews:
+            return
+        CURSOR.executemany(
+            _SQL_INSERT,
+            [(review.year, review.summary, review.employee.id)
+             for review in reviews],
+        )
+        last_id = CURSOR.execute("SELECT max(id) FROM reviews;").fetchone()[0]
+        first_id = last_id - len(reviews) + 1
+        for id, review in zip(range(first_id, last_id + 1), reviews):
+            review.id = id
+        for review in reviews:
+            cls._remember(review)
+
     @classmethod
     def create(cls, year, summary, employee_id):
         """
@@ -146,8 +369,6 @@ class Review:
         Tests call:
             Review.create(2023, "Excellent Python skills!", employee.id)
         """
-        from employee import Employee
-
         employee = Employee.find_by_id(employee_id)
         if not employee:
             raise ValueError("employee_id must refer to a persisted Employee")
@@ -163,27 +384,22 @@ class Review:
         Given a database row, return a cached Review instance
         with attributes matching the row.
         """
-        id, year, summary, employee_id = row
-
-        review = cls.all.get(id)
-        from employee import Employee
-
-        employee = Employee.find_by_id(employee_id)
-
-        if review:
-            review.year = year
-            review.summary = summary
-            review.employee = employee
-        else:
-            review = cls(year, summary, employee, id=id)
-            cls.all[id] = review
-
-        return review
+        employee = Employee.find_by_id(row["employee_id"])
+        return cls.instance_from_db_with_employee(row, employee)
 
     @classmethod
     def find_by_id(cls, id):
-        sql = "SELECT * FROM reviews WHERE id = ?;"
-        row = CURSOR.execute(sql, (id,)).fetchone()
+        """Return Review corresponding to row with given id, or None."""
+        if ENABLE_IDENTITY_CACHE:
+            cached = cls.all.get(id)
+            if cached is not None:
+                cls._remember(cached)
+                return cached
+
+        cursor = cls._find_by_id_cursor
+        if cursor is None:
+            cursor = cls._find_by_id_cursor = CONN.cursor()
+        row = cursor.execute(_SQL_FIND_BY_ID, (id,)).fetchone()
         if row:
             return cls.instance_from_db(row)
         return None
@@ -192,33 +408,84 @@ class Review:
         """
         Update the DB row corresponding to this Review instance.
         """
-        sql = """
-            UPDATE reviews
-            SET year = ?, summary = ?, employee_id = ?
-            WHERE id = ?;
-        """
         CURSOR.execute(
-            sql,
+            _SQL_UPDATE,
             (self.year, self.summary, self.employee.id, self.id),
         )
-        CONN.commit()
-        type(self).all[self.id] = self
+        self._commit()
+        self._remember(self)
 
     def delete(self):
         """
         Delete this Review from the DB and cache.
         """
-        sql = "DELETE FROM reviews WHERE id = ?;"
-        CURSOR.execute(sql, (self.id,))
-        CONN.commit()
+        CURSOR.execute(_SQL_DELETE, (self.id,))
+        self._commit()
 
-        if self.id in type(self).all:
-            del type(self).all[self.id]
+        self.all.pop(self.id, None)
 
         self.id = None
 
+    @classmethod
+    def instance_from_db_with_employee(cls, row, employee):
+        """
+        Like instance_from_db(), but uses an already loaded Employee
+        instead of looking it up by the row's employee_id.
+        Raises ValueError if the row's employee no longer exists.
+        """
+        if not employee:
+            raise ValueError("employee_id must refer to a persisted Employee")
+
+        id = row["id"]
+        review = cls.all.get(id)
+        if not review:
+            review = cls.__new__(cls)
+            review.id = id
+        cls._remember(review)
+        review._rehydrate(row["year"], row["summary"], employee)
+
+        return review
+
+    @classmethod
+    def iter_all(cls):
+        """
+        Yield one Review object per table row, fetching rows as they are
+        consumed. Referenced employees are loaded with a single query up front.
+
+        The SELECT stays open until the iterator is exhausted or closed, and
+        drop_table() and reset_table() fail with "database table is locked"
+        meanwhile; call close() on an iterator that is abandoned early.
+        """
+        rows = CURSOR.execute(_SQL_REVIEW_EMPLOYEES).fetchall()
+        employees = {row["id"]: Employee.instance_from_db(row) for row in rows}
+
+        # a cursor of its own, so queries made while iterating don't reset it
+        cursor = CONN.execute(_SQL_GET_ALL)
+        try:
+            for row in cursor:
+                employee_id = row["employee_id"]
+                employee = employees.get(employee_id)
+                if employee is None:
+                    # a review added while iterating may reference an
+                    # employee created after the prefetch
+                    employee = employees[employee_id] = \
+                        Employee.find_by_id(employee_id)
+                yield cls.instance_from_db_with_employee(row, employee)
+        finally:
+            cursor.close()
+
     @classmethod
     def get_all(cls):
-        sql = "SELECT * FROM reviews;"
-        rows = CURSOR.execute(sql).fetchall()
-        return [cls.instance_from_db(row) for row in rows]
+        """Return a list containing one Review object per table row."""
+        return list(cls.iter_all())
+
+    @staticmethod
+    def _employees_by_id(employee_ids):
+        """Return a dict of Employee instances keyed by id for the given ids."""
+        if not employee_ids:
+            return {}
+        rows = CURSOR.execute(
+            _SQL_EMPLOYEES_BY_ID, (json.dumps(list(employee_ids)),)
+        ).fetchall()
+        employees = [Employee.instance_from_db(row) for row in rows]
+        return {employee.id: employee for employee in employees}
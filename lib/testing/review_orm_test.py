@@ -15,6 +15,8 @@ class TestReview:
         CURSOR.execute("DROP TABLE IF EXISTS employees")
         CURSOR.execute("DROP TABLE IF EXISTS departments")
 
+        Review.all = {}
+
     def test_creates_table(self):
         '''contains method "create_table()" that creates table "reviews" if it does not exist.'''
 
@@ -23,6 +25,17 @@ class TestReview:
         Review.create_table()
         assert (CURSOR.execute("SELECT * FROM reviews"))
 
+    def test_creates_employee_id_index(self):
+        '''contains method "create_table()" that indexes "reviews" by employee_id.'''
+
+        Department.create_table()
+        Employee.create_table()
+        Review.create_table()
+        plan = CURSOR.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM reviews WHERE employee_id = ?", (1,)
+        ).fetchall()
+        assert (any("ix_reviews_employee_id" in row[-1] for row in plan))
+
     def test_drops_table(self):
         '''contains method "drop_table()" that drops table "reviews" if it exists.'''
 
@@ -73,6 +86,38 @@ class TestReview:
         result = CURSOR.execute(sql_table_names).fetchone()
         assert (result is None)
 
+    def test_drop_table_clears_cache(self):
+        '''contains method "drop_table()" that removes the dropped rows from "all".'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+
+        Review.drop_table()
+        Review.create_table()
+        assert (Review.find_by_id(review.id) is None)
+
+    def test_resets_table(self):
+        '''contains method "reset_table()" that drops and recreates an empty "reviews" table.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+
+        Review.reset_table()
+        assert (CURSOR.execute("SELECT * FROM reviews").fetchall() == [])
+        assert (Review.find_by_id(review.id) is None)
+
     def test_saves_review(self):
         '''contains method "save()" that saves an Review instance to the db and sets the instance id.'''
 
@@ -97,6 +142,27 @@ class TestReview:
                 (review.id, review.year, review.summary, review.employee_id) ==
                 (review.id, 2023, "Excellent Python skills!", employee.id))
 
+    def test_saves_review_with_id(self):
+        '''contains method "save()" that updates the row of a saved Review, or inserts it under its id if missing.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review1 = Review.create(2020, "Great coder!", employee.id)
+        review1.summary = "Greatest coder!"
+        review1.save()
+        review2 = Review(2021, "Awesome coder!", employee, id=10)
+        review2.save()
+
+        rows = CURSOR.execute("SELECT * FROM reviews ORDER BY id").fetchall()
+        assert ([(row[0], row[1], row[2], row[3]) for row in rows] ==
+                [(review1.id, 2020, "Greatest coder!", employee.id),
+                 (10, 2021, "Awesome coder!", employee.id)])
+
     def test_creates_review(self):
         '''contains method "create()" that creates a new row in the db using the parameter data and returns a Review instance.'''
 
@@ -255,4 +321,293 @@ class TestReview:
         assert ((reviews[1].id, reviews[1].year, reviews[1].summary, reviews[1].employee_id) ==
                 (review2.id, review2.year, review2.summary, review2.employee_id))
 
- 
\ No newline at end of file
+ 
+    def test_bulk_creates_reviews(self):
+        '''contains method "bulk_create()" that inserts many reviews at once and returns Review instances.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        reviews = Review.bulk_create([
+            (2020, "Great coder!", employee.id),
+            (2021, "Awesome coder!", employee.id),
+            (2022, "Outstanding coder!", employee.id),
+        ])
+
+        rows = CURSOR.execute("SELECT * FROM reviews ORDER BY id").fetchall()
+        assert ([(row[0], row[1], row[2], row[3]) for row in rows] ==
+                [(review.id, review.year, review.summary, review.employee_id)
+                 for review in reviews])
+        assert (all(Review.all[review.id] is review for review in reviews))
+
+    def test_bulk_creates_reviews_from_generator(self):
+        '''contains method "bulk_create()" that accepts any iterable of tuples, such as a generator.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        reviews = Review.bulk_create(
+            (year, "Great coder!", employee.id) for year in (2020, 2021))
+
+        rows = CURSOR.execute("SELECT * FROM reviews ORDER BY id").fetchall()
+        assert (len(reviews) == 2)
+        assert ([(row[0], row[1]) for row in rows] ==
+                [(review.id, review.year) for review in reviews])
+
+    def test_saves_many_reviews(self):
+        '''contains method "save_many()" that inserts new and updates existing reviews in one batch.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review1 = Review.create(2020, "Great coder!", employee.id)
+        review1.summary = "Greatest coder!"
+        review2 = Review(2021, "Awesome coder!", employee)
+
+        Review.save_many([review1, review2])
+
+        rows = CURSOR.execute("SELECT * FROM reviews ORDER BY id").fetchall()
+        assert ([(row[0], row[1], row[2], row[3]) for row in rows] ==
+                [(review1.id, 2020, "Greatest coder!", employee.id),
+                 (review2.id, 2021, "Awesome coder!", employee.id)])
+
+    def test_gets_all_with_deleted_employee(self):
+        '''contains method "get_all()" that raises ValueError for a review whose employee was deleted.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+        employee.delete()
+        Review.all = {}
+
+        with pytest.raises(ValueError):
+            Review.get_all()
+        with pytest.raises(ValueError):
+            Review.find_by_id(review.id)
+
+    def test_saves_many_repeated_instance(self):
+        '''contains method "save_many()" that saves an instance listed twice only once.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review(2022, "Great coder!", employee)
+
+        Review.save_many([review, review])
+
+        rows = CURSOR.execute("SELECT * FROM reviews").fetchall()
+        assert ([(row[0], row[1], row[2], row[3]) for row in rows] ==
+                [(review.id, 2022, "Great coder!", employee.id)])
+
+    def test_saves_many_with_preassigned_ids(self):
+        '''contains method "save_many()" that keeps new reviews from colliding with pre-assigned ids not yet in the db.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review1 = Review.create(2020, "Great coder!", employee.id)
+        review2 = Review(2021, "Awesome coder!", employee)
+        review3 = Review(2022, "Outstanding coder!", employee, id=review1.id + 1)
+
+        Review.save_many([review2, review3])
+
+        rows = CURSOR.execute("SELECT * FROM reviews ORDER BY id").fetchall()
+        assert ([(row[0], row[1], row[2], row[3]) for row in rows] ==
+                [(review1.id, 2020, "Great coder!", employee.id),
+                 (review3.id, 2022, "Outstanding coder!", employee.id),
+                 (review2.id, 2021, "Awesome coder!", employee.id)])
+        assert (len({review1.id, review2.id, review3.id}) == 3)
+
+    def test_gets_all_with_employees(self):
+        '''contains method "get_all()" that attaches the matching Employee to every Review.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee1 = Employee.create("Raha", "Accountant", department.id)
+        employee2 = Employee.create("Lee", "Manager", department.id)
+
+        Review.create_table()
+        Review.create(2020, "Great coder!", employee1.id)
+        Review.create(2021, "Awesome coder!", employee2.id)
+        Review.create(2022, "Outstanding coder!", employee1.id)
+
+        reviews = Review.get_all()
+        assert ([review.employee for review in reviews] ==
+                [employee1, employee2, employee1])
+
+    def test_finds_by_id_from_cache(self):
+        '''contains method "find_by_id()" that returns the cached instance without querying the db.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+
+        CURSOR.execute("DROP TABLE reviews")
+        assert (Review.find_by_id(review.id) is review)
+
+    def test_transaction_commits(self):
+        '''contains method "transaction()" that commits the grouped writes when the block exits.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        with Review.transaction():
+            review1 = Review.create(2020, "Great coder!", employee.id)
+            review2 = Review.create(2021, "Awesome coder!", employee.id)
+            assert (CONN.in_transaction)
+
+        assert (not CONN.in_transaction)
+        rows = CURSOR.execute("SELECT id FROM reviews ORDER BY id").fetchall()
+        assert ([row[0] for row in rows] == [review1.id, review2.id])
+
+    def test_transaction_rolls_back(self):
+        '''contains method "transaction()" that rolls back the grouped writes when the block raises.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        with pytest.raises(ValueError):
+            with Review.transaction():
+                review = Review.create(2020, "Great coder!", employee.id)
+                Review.create(1999, "Too early", employee.id)
+
+        assert (CURSOR.execute("SELECT * FROM reviews").fetchall() == [])
+        assert (Review.find_by_id(review.id) is None)
+
+    def test_iterates_all(self):
+        '''contains method "iter_all()" that yields a Review instance for every record in the db.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review1 = Review.create(2020, "Great coder!", employee.id)
+        review2 = Review.create(2021, "Awesome coder!", employee.id)
+
+        reviews = Review.iter_all()
+        assert (next(reviews) is review1)
+        # other queries while iterating must not disturb the iterator
+        Review.create(2022, "Outstanding coder!", employee.id)
+        assert (next(reviews) is review2)
+
+    def test_transaction_rolls_back_table_changes(self):
+        '''contains method "transaction()" whose rollback also undoes "create_table()" and "reset_table()".'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+
+        with pytest.raises(ValueError):
+            with Review.transaction():
+                Review.create(2021, "Awesome coder!", employee.id)
+                Review.create_table()
+                Review.reset_table()
+                raise ValueError("abort")
+
+        rows = CURSOR.execute("SELECT * FROM reviews").fetchall()
+        assert ([(row[0], row[2]) for row in rows] == [(review.id, "Great coder!")])
+
+    def test_iterates_all_with_employee_missing_from_prefetch(self, monkeypatch):
+        '''contains method "iter_all()" that looks up employees the up-front query did not load.'''
+
+        import review as review_module
+        # simulate a review whose employee was created after the prefetch
+        monkeypatch.setattr(review_module, "_SQL_REVIEW_EMPLOYEES",
+                            "SELECT * FROM employees WHERE 0;")
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review = Review.create(2020, "Great coder!", employee.id)
+
+        assert (list(Review.iter_all()) == [review])
+        assert (review.employee is employee)
+
+    def test_closed_iterator_releases_table(self):
+        '''contains method "iter_all()" whose iterator releases the table once closed.'''
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        Review.create(2020, "Great coder!", employee.id)
+        Review.create(2021, "Awesome coder!", employee.id)
+
+        reviews = Review.iter_all()
+        next(reviews)
+        reviews.close()
+        Review.drop_table()
+
+    def test_cache_evicts_least_recently_used(self, monkeypatch):
+        '''keeps at most "MAX" instances in "all", evicting the least recently used.'''
+
+        monkeypatch.setattr(Review, "MAX", 2)
+
+        Department.create_table()
+        department = Department.create("Payroll", "Building A, 5th Floor")
+
+        Employee.create_table()
+        employee = Employee.create("Raha", "Accountant", department.id)
+
+        Review.create_table()
+        review1 = Review.create(2020, "Great coder!", employee.id)
+        review2 = Review.create(2021, "Awesome coder!", employee.id)
+        Review.find_by_id(review1.id)
+        review3 = Review.create(2022, "Outstanding coder!", employee.id)
+
+        assert (list(Review.all) == [review1.id, review3.id])
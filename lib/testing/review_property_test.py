@@ -10,12 +10,11 @@ class TestReviewProperties:
     @pytest.fixture(autouse=True)
     def reset_db(self):
         '''drop and recreate tables prior to each test.'''
-        Review.drop_table()
         Employee.drop_table()
         Department.drop_table()
         Department.create_table()
         Employee.create_table()
-        Review.create_table()
+        Review.reset_table()
 
     def test_review_valid(self):
         '''validates name, job title, department id are valid'''
@@ -51,6 +50,20 @@ class TestReviewProperties:
             employee = Employee.create("Lee", "Manager", department.id)
             review = Review.create(2023, "", employee.id)
 
+    def test_summary_is_string(self):
+        '''validates summary property is assigned a string'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            review = Review.create(2023, 2023, employee.id)
+
+    def test_summary_is_not_bytes(self):
+        '''validates summary property is not assigned bytes'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            review = Review.create(2023, b"Excellent work ethic!", employee.id)
+
     def test_employee_fk_property_assignment(self):
         with pytest.raises(ValueError):
             department = Department.create("Payroll", "Building A, 5th Floor")
@@ -58,3 +71,40 @@ class TestReviewProperties:
             review = Review.create(
                 2023, "Excellent work ethic! Outstanding programming skills!", employee.id)
             review.employee_id = 100  # id not in employees table
+
+    def test_bulk_create_employee_fk(self):
+        '''validates bulk_create employee ids refer to persisted employees'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            Review.bulk_create([
+                (2023, "Excellent work ethic!", employee.id),
+                (2023, "Outstanding programming skills!", 100),
+            ])
+
+    def test_employee_requires_persisted_employee(self):
+        '''validates employee property is assigned a persisted Employee'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            review = Review.create(
+                2023, "Excellent work ethic! Outstanding programming skills!", employee.id)
+            review.employee = Employee("Sasha", "Manager", department.id)
+
+    def test_employee_is_employee(self):
+        '''validates employee property is assigned an Employee or employee id'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            review = Review.create(
+                2023, "Excellent work ethic! Outstanding programming skills!", employee.id)
+            review.employee = "Lee"
+
+    def test_bulk_create_many_employee_ids(self):
+        '''validates bulk_create employee ids without a limit on how many distinct ids'''
+        with pytest.raises(ValueError):
+            department = Department.create("Payroll", "Building A, 5th Floor")
+            employee = Employee.create("Lee", "Manager", department.id)
+            Review.bulk_create(
+                [(2023, "Excellent work ethic!", employee.id + n)
+                 for n in range(300000)])